@@ -16,18 +16,19 @@ Environment variables (.env required):
   REWARDS_ADDR    Address of the Rewards account
 
 Usage:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
   python check_targets_balance.py
 """
 
 import os
 import sys
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 from algosdk.v2client import algod
 from algosdk.error import AlgodHTTPError
+from common import asset_map, get_client, load_env
 
 # Load environment settings
-load_dotenv()
+load_env()
 
 def get_env_var(name: str) -> str:
     """Return the value of the environment variable or exit if missing."""
@@ -42,7 +43,7 @@ def init_algod_client() -> algod.AlgodClient:
     address = get_env_var("ALGOD_ADDRESS")
     token   = os.getenv("ALGOD_TOKEN", "")
     try:
-        return algod.AlgodClient(token, address)
+        return get_client(token, address)
     except Exception as e:
         print(f"ERROR: Could not connect to Algod: {e}")
         sys.exit(1)
@@ -58,10 +59,7 @@ def fetch_asset_balance(client: algod.AlgodClient, address: str, asset_id: int)
         print(f"ERROR: Failed to fetch account info for {address}: {e}")
         return 0
 
-    for asset in acct_info.get("assets", []):
-        if asset.get("asset-id") == asset_id:
-            return asset.get("amount", 0)
-    return 0
+    return asset_map(acct_info).get(asset_id, 0)
 
 def main():
     # Initialize client and read config
@@ -73,9 +71,15 @@ def main():
         "Rewards address": get_env_var("REWARDS_ADDR"),
     }
 
+    # Lookups are bound by HTTP latency: fetch all accounts concurrently
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        balances = list(pool.map(
+            lambda addr: fetch_asset_balance(client, addr, asset_id),
+            targets.values(),
+        ))
+
     print(f"=== Balances for ASA {asset_id} ===")
-    for name, addr in targets.items():
-        bal = fetch_asset_balance(client, addr, asset_id)
+    for (name, addr), bal in zip(targets.items(), balances):
         print(f"{name} ({addr}): {bal}")
 
 if __name__ == "__main__":
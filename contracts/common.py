@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+common.py
+
+Helpers shared by the FastAPI service and the CLI scripts.
+
+  • load_env           load .env into os.environ, once per process
+  • PooledAlgodClient  AlgodClient that reuses keep-alive connections
+  • get_client         one PooledAlgodClient per (token, address) per process
+  • keys_from_mnemonic memoized mnemonic → (private_key, address)
+  • build_transfers    asset transfers from one sender, cloned from a prototype
+  • build_optins       ASA opt-ins for several accounts, cloned the same way
+  • sign_all           sign a transaction group, in parallel for large groups
+  • PooledAccountSigner  AtomicTransactionComposer signer backed by sign_all
+  • wait_for_confirmation_after  long-poll confirmation starting at a known round
+  • fast_wait          poll a transaction every interval seconds until confirmed
+  • asset_map          asset-id → amount map of an account_info response
+  • asa_amount         one ASA's balance from an account_info response
+  • asa_holding        one ASA's balance via the per-asset endpoint, None if
+                       not opted in
+
+Scripts under scripts/ add the contracts/ folder to sys.path before
+importing this module.
+
+Dependencies:
+  pip install python-dotenv py-algorand-sdk requests
+"""
+
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from algosdk import account, constants, mnemonic
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+from algosdk.transaction import AssetTransferTxn
+from algosdk.v2client import algod
+from algosdk.error import (
+    AlgodHTTPError,
+    AlgodResponseError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
+)
+
+@lru_cache(maxsize=1)
+def load_env() -> bool:
+    """
+    Load .env into os.environ on first call; later calls are free. Commands
+    chained through manage.py and tests importing one another would
+    otherwise each re-read and re-parse the file.
+
+    The file is searched for from contracts/ upwards, which finds
+    contracts/.env for the service, the scripts, and the tests alike.
+    """
+    return load_dotenv()
+
+class PooledAlgodClient(algod.AlgodClient):
+    """
+    AlgodClient that sends every request through one requests.Session.
+
+    The stock client opens a fresh connection per call (urllib); here the TCP
+    and TLS handshakes are paid once and reused for the back-to-back calls a
+    typical flow makes (account_info, suggested_params, send, confirm).
+    """
+
+    def __init__(self, algod_token: str, algod_address: str, headers=None):
+        super().__init__(algod_token, algod_address, headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.1),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+        timeout=30,
+    ):
+        """Same contract as AlgodClient.algod_request, over the pooled session."""
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+
+        resp = self.session.request(
+            method,
+            self.algod_address + requrl,
+            params=params,
+            data=data,
+            headers=header,
+            timeout=timeout,
+        )
+
+        if resp.status_code >= 400:
+            try:
+                body = resp.json()
+            except ValueError:
+                body = {}
+            raise AlgodHTTPError(body.get("message", resp.text), resp.status_code, body.get("data"))
+
+        if response_format != "json":
+            return resp.content
+        # Some algod responses are a 200 OK with an empty body
+        if not resp.content:
+            return {}
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise AlgodResponseError("Failed to parse JSON response from algod") from e
+
+@lru_cache(maxsize=None)
+def get_client(algod_token: str, algod_address: str) -> PooledAlgodClient:
+    """
+    Return the process-wide PooledAlgodClient for this node, creating it on
+    first use. Scripts run back to back (see manage.py) share its connections.
+    """
+    return PooledAlgodClient(algod_token, algod_address)
+
+@lru_cache(maxsize=None)
+def keys_from_mnemonic(mnem: str) -> Tuple[bytes, str]:
+    """Derive (private_key, address) from a 25-word mnemonic, once per mnemonic."""
+    sk = mnemonic.to_private_key(mnem)
+    return sk, account.address_from_private_key(sk)
+
+def wait_for_confirmation_after(client, txid: str, start_round: int, wait_rounds: int = 4) -> dict:
+    """
+    Block until txid is confirmed and return its pending-transaction info.
+
+    Unlike transaction.wait_for_confirmation, this skips the initial /v2/status
+    call: start from a round already known (e.g. sp.first of the params the
+    transaction was built with) and block on /v2/status/wait-for-block-after,
+    a server-side long-poll, checking the transaction once per new block.
+    Gives up after wait_rounds blocks.
+    """
+    last_round = start_round
+    deadline   = None
+    while True:
+        last_round = client.status_after_block(last_round)["last-round"]
+        if deadline is None:
+            deadline = last_round + wait_rounds - 1
+        try:
+            info = client.pending_transaction_info(txid)
+            if info.get("pool-error"):
+                raise TransactionRejectedError("Transaction rejected: " + info["pool-error"])
+            if info.get("confirmed-round", 0) > 0:
+                return info
+        except AlgodHTTPError:
+            # A load-balanced node may not know the txid yet; try again next block
+            pass
+        if last_round >= deadline:
+            raise ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out")
+
+def fast_wait(client, txid: str, timeout: float = 20, interval: float = 0.5) -> dict:
+    """
+    Poll pending_transaction_info every interval seconds and return it as soon
+    as txid is confirmed. Confirmation is noticed within interval of the block
+    being produced, without the initial /v2/status round trip of
+    transaction.wait_for_confirmation. Gives up after timeout seconds; the
+    default leaves room for about four ~4.5 s rounds, covering a txn that
+    only lands a round or two after it was sent.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            info = client.pending_transaction_info(txid)
+            if info.get("pool-error"):
+                raise TransactionRejectedError("Transaction rejected: " + info["pool-error"])
+            if info.get("confirmed-round", 0) > 0:
+                return info
+        except AlgodHTTPError:
+            # A load-balanced node may not know the txid yet; poll again
+            pass
+        if time.monotonic() + interval > deadline:
+            raise ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out")
+        time.sleep(interval)
+
+def asa_holding(client, addr: str, asset_id: int) -> Optional[int]:
+    """
+    Return addr's amount of asset_id, or None if addr has not opted in.
+
+    Uses /v2/accounts/{addr}/assets/{asset-id}, which returns just the one
+    holding rather than the whole account (every ASA, app local state, ...)
+    like account_info does.
+    """
+    try:
+        return client.account_asset_info(addr, asset_id)["asset-holding"]["amount"]
+    except AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+def asset_map(info: dict) -> Dict[int, int]:
+    """Map asset-id → amount for every ASA held in an account_info response."""
+    return {a["asset-id"]: a.get("amount", 0) for a in info.get("assets", ())}
+
+def asa_amount(info: dict, asset_id: int) -> int:
+    """
+    Return the amount of asset_id held in an account_info response (0 if the
+    account has not opted in). For several lookups on one response, build
+    asset_map(info) once instead.
+    """
+    return asset_map(info).get(asset_id, 0)
+
+def build_transfers(
+    sender: str,
+    sp,
+    asset_id: int,
+    transfers: Sequence[Tuple[str, int]],
+    note: Optional[bytes] = None,
+) -> List[AssetTransferTxn]:
+    """
+    Build one AssetTransferTxn of asset_id from sender per (receiver, amount),
+    each carrying note (if given).
+
+    Only one transaction goes through the SDK constructor, which (without a
+    flat fee) signs a throwaway copy with a fresh key just to size the fee. The
+    others are shallow copies with receiver and amount swapped, about 3x faster
+    for a 3-transfer group. The prototype carries the largest amount, so its
+    fee also covers every copy.
+    """
+    proto = AssetTransferTxn(
+        sender, sp, transfers[0][0], max(amt for _, amt in transfers), asset_id, note=note
+    )
+    txns = []
+    for receiver, amt in transfers:
+        txn = copy.copy(proto)
+        txn.receiver = receiver
+        txn.amount   = amt
+        txns.append(txn)
+    return txns
+
+def build_optins(sp, asset_id: int, addrs: Sequence[str]) -> List[AssetTransferTxn]:
+    """
+    Build one opt-in (a 0-amount self-transfer of asset_id) per address. As in
+    build_transfers, only the first goes through the SDK constructor; the
+    others are copies with sender and receiver swapped. Opt-ins differ only
+    in addresses, which all encode to the same size, so one fee fits all.
+    """
+    proto = AssetTransferTxn(addrs[0], sp, addrs[0], 0, asset_id)
+    txns = []
+    for addr in addrs:
+        txn = copy.copy(proto)
+        txn.sender   = addr
+        txn.receiver = addr
+        txns.append(txn)
+    return txns
+
+# Below this size, thread hand-off costs more than the signatures themselves
+# (~0.1 ms each, mostly msgpack encoding under the GIL).
+PARALLEL_SIGN_MIN = 8
+
+@lru_cache(maxsize=1)
+def _signing_pool() -> ThreadPoolExecutor:
+    """Process-wide executor for sign_all, created on first use."""
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+def sign_all(txns, sk) -> list:
+    """
+    Sign every transaction in txns with sk and return them in order.
+    Large groups are signed on a thread pool: the Ed25519 step runs in
+    libsodium, which releases the GIL.
+    """
+    if len(txns) < PARALLEL_SIGN_MIN:
+        return [txn.sign(sk) for txn in txns]
+    return list(_signing_pool().map(lambda txn: txn.sign(sk), txns))
+
+class PooledAccountSigner(AccountTransactionSigner):
+    """
+    AccountTransactionSigner that signs its share of a composer's group with
+    sign_all, so large groups use the signing pool.
+    """
+
+    def sign_transactions(self, txn_group, indexes):
+        return sign_all([txn_group[i] for i in indexes], self.private_key)
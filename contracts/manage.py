@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+manage.py
+
+Single command-line entry point for the treasury scripts.
+
+Commands can be chained, so a workflow that needs several scripts runs in one
+Python process: .env is parsed once, and every command shares the same pooled
+Algod client and derived keys (common.get_client / common.keys_from_mnemonic)
+instead of paying a new TLS handshake and mnemonic decode per script.
+
+Each script is imported only when its command runs, so a command only
+requires the environment variables of the script it wraps.
+
+Dependencies:
+  pip install click
+
+Usage:
+  python manage.py --help
+  python manage.py optin-targets check-targets-balance
+"""
+
+import click
+
+from common import load_env
+
+load_env()
+
+@click.group(chain=True)
+def cli():
+    """Dumbly treasury management commands."""
+
+@cli.command()
+def create_asa():
+    """Create the Dumbly ASA and print its asset-id."""
+    from scripts import create_asa
+    create_asa.main()
+
+@cli.command()
+def optin_targets():
+    """Opt-in the Burn, LP, and Rewards accounts to the ASA."""
+    from scripts import optin_targets
+    optin_targets.main()
+
+@cli.command()
+def deploy():
+    """Compile and deploy the tax application."""
+    from scripts import deploy
+    deploy.main()
+
+@cli.command()
+def distribute():
+    """Split the Treasury balance evenly between Burn, LP, and Rewards."""
+    from scripts import distribute
+    distribute.main()
+
+@cli.command()
+def check_balance():
+    """Print the Treasury's Dumbly balance."""
+    from scripts import check_balance
+    check_balance.main()
+
+@cli.command()
+def check_targets_balance():
+    """Print the Burn, LP, and Rewards balances."""
+    import check_targets_balance
+    check_targets_balance.main()
+
+if __name__ == "__main__":
+    cli()
@@ -11,19 +11,21 @@ Environment Variables (.env):
   ASSET_ID          Numeric ASA ID for "Dumbly"
 
 Usage:
-  pip install python-dotenv algosdk
+  pip install python-dotenv algosdk requests
   python check_balance.py
 """
 
 import os
 import sys
-from dotenv import load_dotenv
-from algosdk import mnemonic, account
 from algosdk.v2client import algod
 from algosdk.error import AlgodHTTPError
 
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import asset_map, get_client, keys_from_mnemonic, load_env
+
 # Load .env variables into environment
-load_dotenv()
+load_env()
 
 def get_env_var(name: str) -> str:
     """
@@ -42,7 +44,7 @@ def init_algod_client() -> algod.AlgodClient:
     address = get_env_var("ALGOD_ADDRESS")
     token   = os.getenv("ALGOD_TOKEN", "")  # allow empty token
     try:
-        return algod.AlgodClient(token, address)
+        return get_client(token, address)
     except Exception as e:
         print(f"ERROR: Failed to connect to Algod: {e}")
         sys.exit(1)
@@ -53,8 +55,8 @@ def get_treasury_address() -> str:
     """
     mnem = get_env_var("TREASURY_MNEMONIC")
     try:
-        private_key = mnemonic.to_private_key(mnem)
-        return account.address_from_private_key(private_key)
+        _, address = keys_from_mnemonic(mnem)
+        return address
     except Exception as e:
         print(f"ERROR: Failed to convert mnemonic to address: {e}")
         sys.exit(1)
@@ -70,10 +72,7 @@ def fetch_asset_balance(client: algod.AlgodClient, address: str, asset_id: int)
         print(f"ERROR: HTTP error fetching account info: {e}")
         sys.exit(1)
 
-    for asset in info.get("assets", []):
-        if asset.get("asset-id") == asset_id:
-            return asset.get("amount", 0)
-    return 0
+    return asset_map(info).get(asset_id, 0)
 
 def main():
     # 1) Initialize client and parameters
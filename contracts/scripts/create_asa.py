@@ -10,7 +10,7 @@ Before running:
   2) (Optional) Set ASSET_ID if you’re re-creating an existing asset.
 
 Install dependencies:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
 
 Run:
   python create_asa.py
@@ -18,14 +18,15 @@ Run:
 
 import os
 import sys
-from dotenv import load_dotenv
-from algosdk import mnemonic, account
-from algosdk.v2client import algod
 from algosdk.transaction import AssetConfigTxn, wait_for_confirmation
 from algosdk.error import AlgodHTTPError
 
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import get_client, keys_from_mnemonic, load_env
+
 # Load our .env values
-load_dotenv()
+load_env()
 
 ALGOD_ADDRESS  = os.getenv("ALGOD_ADDRESS")
 ALGOD_TOKEN    = os.getenv("ALGOD_TOKEN", "")
@@ -38,9 +39,8 @@ if not ALGOD_ADDRESS or not ADMIN_MNEMONIC:
 
 # Turn the mnemonic into a usable keypair
 try:
-    admin_sk   = mnemonic.to_private_key(ADMIN_MNEMONIC)
-    admin_addr = account.address_from_private_key(admin_sk)
-    client     = algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+    admin_sk, admin_addr = keys_from_mnemonic(ADMIN_MNEMONIC)
+    client               = get_client(ALGOD_TOKEN, ALGOD_ADDRESS)
 except Exception as e:
     print(f"❌ Could not set up Algod client or account: {e}")
     sys.exit(1)
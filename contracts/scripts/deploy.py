@@ -7,6 +7,7 @@ creates a new Algorand application on TestNet or MainNet.
 
 Before running:
   1) Make sure approval.teal and clear.teal are in the same folder.
+     Compiled programs are cached alongside them (*.teal.<hash>.bin).
   2) Copy .env.example → .env and fill in:
      - ALGOD_ADDRESS: your Algod API endpoint
      - ADMIN_MNEMONIC: the 25-word mnemonic of your admin account
@@ -14,7 +15,7 @@ Before running:
      (ALGOD_TOKEN and APP_ID are optional here.)
 
 Install dependencies:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
 
 Run:
   python deploy.py
@@ -23,14 +24,18 @@ Run:
 import os
 import sys
 import base64
-from dotenv import load_dotenv
-from algosdk import mnemonic, account, transaction
-from algosdk.v2client import algod
+import hashlib
+import tempfile
+from algosdk import transaction
 from algosdk.encoding import decode_address
 from algosdk.error import AlgodHTTPError
 
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import get_client, keys_from_mnemonic, load_env
+
 # Load environment settings
-load_dotenv()
+load_env()
 
 ALGOD_ADDRESS  = os.getenv("ALGOD_ADDRESS")
 ALGOD_TOKEN    = os.getenv("ALGOD_TOKEN", "")
@@ -45,19 +50,49 @@ if not ALGOD_ADDRESS or not ADMIN_MNEMONIC or not TREASURY_ADDR:
 def init_client_and_keys():
     """Initialize Algod client and derive admin account keys."""
     try:
-        admin_sk   = mnemonic.to_private_key(ADMIN_MNEMONIC)
-        admin_addr = account.address_from_private_key(admin_sk)
-        client     = algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+        admin_sk, admin_addr = keys_from_mnemonic(ADMIN_MNEMONIC)
+        client               = get_client(ALGOD_TOKEN, ALGOD_ADDRESS)
     except Exception as e:
         print(f"❌ Failed to set up Algod client or account keys: {e}")
         sys.exit(1)
     return client, admin_sk, admin_addr
 
 def compile_teal_file(client, filename: str) -> bytes:
-    """Compile a TEAL file and return the compiled bytes."""
-    source = open(filename, "r").read()
+    """
+    Compile a TEAL file and return the compiled bytes.
+    The result is cached next to the source as <filename>.<hash>.bin, keyed by
+    the source hash, so redeploying unchanged TEAL skips the Algod compile call.
+    The cache file is written to a temp file and renamed into place, so an
+    interrupted run never leaves a truncated program behind.
+
+    Assembly itself stays on Algod: neither pyteal (which only emits TEAL text)
+    nor algosdk ships a TEAL assembler, so the cache is what keeps repeat
+    deploys free of compile round trips.
+    """
+    with open(filename, "r") as f:
+        source = f.read()
+
+    digest     = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+    cache_path = f"{filename}.{digest}.bin"
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return f.read()
+
     response = client.compile(source)
-    return base64.b64decode(response["result"])
+    program  = base64.b64decode(response["result"])
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(cache_path) or ".",
+        prefix=os.path.basename(cache_path) + ".",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(program)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return program
 
 def main():
     client, admin_sk, admin_addr = init_client_and_keys()
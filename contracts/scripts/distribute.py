@@ -11,22 +11,31 @@ This script groups the three AssetTransfer transactions atomically,
 so they either all succeed or all fail together.
 
 Dependencies:
-  pip install py-algorand-sdk
+  pip install py-algorand-sdk requests
 
 Usage:
   python distribute.py
 """
 
-from dotenv import load_dotenv
 import os
 import sys
 
-from algosdk import mnemonic, account
-from algosdk.v2client import algod
-from algosdk.transaction import AssetTransferTxn, calculate_group_id, wait_for_confirmation
+from algosdk.transaction import calculate_group_id
+
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import (
+    asa_amount,
+    build_transfers,
+    get_client,
+    keys_from_mnemonic,
+    load_env,
+    sign_all,
+    wait_for_confirmation_after,
+)
 
 # Load environment variables from .env
-load_dotenv()
+load_env()
 
 # Algod network settings
 ALGOD_ADDRESS = os.getenv("ALGOD_ADDRESS", "https://testnet-api.4160.nodely.dev")
@@ -53,19 +62,16 @@ if not all([BURN_ADDR, REWARDS_ADDR, LP_ADDR]):
     sys.exit(1)
 
 # Initialize Algod client and Treasury account keys
-treasury_sk   = mnemonic.to_private_key(TREASURY_MNEMONIC)
-treasury_addr = account.address_from_private_key(treasury_sk)
-client        = algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
-sp            = client.suggested_params()
+treasury_sk, treasury_addr = keys_from_mnemonic(TREASURY_MNEMONIC)
+client                     = get_client(ALGOD_TOKEN, ALGOD_ADDRESS)
+sp                         = client.suggested_params()
 
 def main():
     # Fetch current Treasury balance for the ASA
-    acct   = client.account_info(treasury_addr)
-    assets = acct.get("assets", [])
-    total  = next((a["amount"] for a in assets if a["asset-id"] == ASSET_ID), 0)
+    total = asa_amount(client.account_info(treasury_addr), ASSET_ID)
 
-    print(f"ℹ️ Current Treasury balance: {total} Dumbly")
     if total <= 0:
+        print(f"ℹ️ Current Treasury balance: {total} Dumbly")
         print("ℹ️ Nothing to distribute. Exiting.")
         return
 
@@ -73,25 +79,27 @@ def main():
     burn_amt    = total // 3
     rewards_amt = total // 3
     lp_amt      = total - burn_amt - rewards_amt
+    print(f"ℹ️ Current Treasury balance: {total} Dumbly")
     print(f"ℹ️ Splitting into burn={burn_amt}, rewards={rewards_amt}, lp={lp_amt}")
 
     # Build the three transfer transactions
-    tx1 = AssetTransferTxn(sender=treasury_addr, sp=sp, receiver=BURN_ADDR,    amt=burn_amt,    index=ASSET_ID)
-    tx2 = AssetTransferTxn(sender=treasury_addr, sp=sp, receiver=REWARDS_ADDR, amt=rewards_amt, index=ASSET_ID)
-    tx3 = AssetTransferTxn(sender=treasury_addr, sp=sp, receiver=LP_ADDR,      amt=lp_amt,      index=ASSET_ID)
+    txs = build_transfers(treasury_addr, sp, ASSET_ID, [
+        (BURN_ADDR,    burn_amt),
+        (REWARDS_ADDR, rewards_amt),
+        (LP_ADDR,      lp_amt),
+    ])
 
     # Group them atomically
-    txs = [tx1, tx2, tx3]
     gid = calculate_group_id(txs)
     for tx in txs:
         tx.group = gid
 
     # Sign and send
-    signed_txs = [tx.sign(treasury_sk) for tx in txs]
+    signed_txs = sign_all(txs, treasury_sk)
     try:
         txid = client.send_transactions(signed_txs)
         print(f"⏳ Group transaction sent, txID: {txid}")
-        wait_for_confirmation(client, txid, 4)
+        wait_for_confirmation_after(client, txid, sp.first)
     except Exception as e:
         print(f"ERROR: Failed to send or confirm group transaction: {e}")
         sys.exit(1)
@@ -4,7 +4,10 @@ optin_targets.py
 
 Opt-in the Burn, LP, and Rewards accounts to the Dumbly ASA on Algorand.
 Each account sends a zero-amount AssetTransferTxn to itself, which enables
-it to hold the ASA.
+it to hold the ASA. The three opt-ins are submitted as one atomic group
+(each signed by its own account), so they confirm together in one round.
+Re-running is harmless: a zero-amount self-transfer from an account that
+has already opted in is still valid.
 
 Environment variables (in .env):
   ALGOD_ADDRESS     Algod API endpoint (e.g. https://testnet-api.algonode.cloud)
@@ -15,19 +18,21 @@ Environment variables (in .env):
   REWARDS_MNEMONIC  Mnemonic for the Rewards account
 
 Usage:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
   python optin_targets.py
 """
 
 import os
 import sys
-from dotenv import load_dotenv
-from algosdk import mnemonic, account
 from algosdk.v2client import algod
-from algosdk.transaction import AssetTransferTxn, wait_for_confirmation
+from algosdk.transaction import AssetTransferTxn, calculate_group_id
 from algosdk.error import AlgodHTTPError
 
-load_dotenv()  # load variables from .env
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import get_client, keys_from_mnemonic, load_env, wait_for_confirmation_after
+
+load_env()  # load variables from .env
 
 def get_env_var(name: str) -> str:
     value = os.getenv(name)
@@ -41,7 +46,7 @@ def init_client() -> algod.AlgodClient:
     address = get_env_var("ALGOD_ADDRESS")
     token   = os.getenv("ALGOD_TOKEN", "")
     try:
-        return algod.AlgodClient(token, address)
+        return get_client(token, address)
     except Exception as e:
         print(f"ERROR: Could not connect to Algod: {e}")
         sys.exit(1)
@@ -53,8 +58,7 @@ def load_account(env_key: str):
     """
     mnem = get_env_var(env_key)
     try:
-        sk   = mnemonic.to_private_key(mnem)
-        addr = account.address_from_private_key(sk)
+        sk, addr = keys_from_mnemonic(mnem)
         return addr, sk
     except Exception as e:
         print(f"ERROR: Invalid mnemonic in {env_key}: {e}")
@@ -72,17 +76,27 @@ def main():
         ("Rewards","REWARDS_MNEMONIC"),
     ]
 
-    for name, key in accounts:
-        addr, sk = load_account(key)
-        try:
-            # Zero-amount transfer to self = opt-in
-            txn   = AssetTransferTxn(sender=addr, sp=sp, receiver=addr, amt=0, index=asset_id)
-            stxn  = txn.sign(sk)
-            txid  = client.send_transaction(stxn)
-            wait_for_confirmation(client, txid, 4)
-            print(f"✅ Opt-in successful for {name} account ({addr})")
-        except AlgodHTTPError as e:
-            print(f"⚠️{name} opt-in failed or already done: {e}")
+    loaded = [(name, *load_account(key)) for name, key in accounts]
+
+    # Zero-amount transfer to self = opt-in, grouped so all land in one round
+    txns = [
+        AssetTransferTxn(sender=addr, sp=sp, receiver=addr, amt=0, index=asset_id)
+        for _, addr, _ in loaded
+    ]
+    gid = calculate_group_id(txns)
+    for txn in txns:
+        txn.group = gid
+
+    try:
+        signed = [txn.sign(sk) for txn, (_, _, sk) in zip(txns, loaded)]
+        txid   = client.send_transactions(signed)
+        wait_for_confirmation_after(client, txid, sp.first)
+    except AlgodHTTPError as e:
+        print(f"⚠️ Opt-in group failed: {e}")
+        sys.exit(1)
+
+    for name, addr, _ in loaded:
+        print(f"✅ Opt-in successful for {name} account ({addr})")
 
 if __name__ == "__main__":
     main()
@@ -6,8 +6,20 @@ FastAPI backend for the Dumbly token treasury.
 Provides endpoints to:
   • GET  /treasury-balance       ⇒ returns current ASA balance in treasury  
   • POST /distribute-manual      ⇒ distribute custom amounts to Burn, LP, Rewards  
+                                   (?validate=false skips the balance pre-check)
   • POST /distribute-all         ⇒ split entire balance evenly (1/3 each)
 
+Treasury account info is cached in-process for ACCOUNT_INFO_TTL seconds and
+dropped after every distribution, so UI polling does not hammer Algod.
+Suggested params are likewise reused for up to PARAMS_TTL seconds; every
+group carries a random note, so requests sharing params never produce
+identical (duplicate) transactions. The distribution endpoints track the
+treasury balance locally (debited on each confirmed group) and only re-read
+it from Algod every BALANCE_TTL seconds (at most ACCOUNT_INFO_TTL). Tax
+credited to the treasury in that window is not seen until the next read, so
+/distribute-all always reads the balance live, and a validation failure in
+/distribute-manual is re-checked against a live read before returning 400.
+
 Environment variables (.env):
   ALGOD_ADDRESS     Algod API endpoint (e.g. https://testnet-api.algonode.cloud)
   ALGOD_TOKEN       Algod API token (may be empty)
@@ -16,26 +28,41 @@ Environment variables (.env):
   BURN_ADDR         Burn account address
   LP_ADDR           LP account address
   REWARDS_ADDR      Rewards account address
+  BALANCE_TTL       Seconds to trust the locally tracked balance (default 10,
+                    capped at ACCOUNT_INFO_TTL)
 
 Install dependencies:
-  pip install python-dotenv fastapi uvicorn algosdk pydantic
-Run:
+  pip install python-dotenv fastapi uvicorn algosdk pydantic requests
+Run (development):
   uvicorn service:app --reload
+Run (production; needs pip install "uvicorn[standard]"):
+  uvicorn service:app --workers 4 --loop uvloop --http httptools
+  Caches are per worker: see README for the BALANCE_TTL trade-off.
 """
 
+import asyncio
 import os
 import sys
-from dotenv import load_dotenv
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, conint
-from algosdk import mnemonic, account
-from algosdk.v2client import algod
-from algosdk.transaction import AssetTransferTxn, calculate_group_id, wait_for_confirmation
+from algosdk.transaction import calculate_group_id, wait_for_confirmation
 from algosdk.error import AlgodHTTPError
+from common import (
+    asa_amount,
+    build_transfers,
+    get_client,
+    keys_from_mnemonic,
+    load_env,
+    sign_all,
+)
 
 # ─── Load environment ──────────────────────────────────────────────────────────
-load_dotenv()
+load_env()
 
 def get_env_var(name: str) -> str:
     """Return an env var or exit if missing."""
@@ -53,6 +80,7 @@ ASSET_ID          = int(get_env_var("ASSET_ID"))
 BURN_ADDR         = get_env_var("BURN_ADDR")
 LP_ADDR           = get_env_var("LP_ADDR")
 REWARDS_ADDR      = get_env_var("REWARDS_ADDR")
+BALANCE_TTL       = float(os.getenv("BALANCE_TTL", "10"))
 
 # ─── FastAPI setup ─────────────────────────────────────────────────────────────
 app = FastAPI()
@@ -67,104 +95,227 @@ app.add_middleware(
 )
 
 # ─── Initialize Algod client & Treasury keys ───────────────────────────────────
+def treasury_keys() -> Tuple[bytes, str]:
+    """(private_key, address) of the Treasury; decoded once, see common.keys_from_mnemonic."""
+    return keys_from_mnemonic(TREASURY_MNEMONIC)
+
 try:
-    client        = algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
-    treasury_sk   = mnemonic.to_private_key(TREASURY_MNEMONIC)
-    treasury_addr = account.address_from_private_key(treasury_sk)
+    client = get_client(ALGOD_TOKEN, ALGOD_ADDRESS)
+    treasury_keys()  # fail fast on a bad mnemonic
 except Exception as e:
     print(f"ERROR: Failed to initialize Algod client or keys: {e}")
     sys.exit(1)
 
-# ─── Request model for manual distribution ──────────────────────────────────────
+# ─── Algod response caches ─────────────────────────────────────────────────────
+class TTLCache:
+    """
+    Tiny in-process cache whose entries expire after a per-entry TTL.
+    Thread-safe: endpoints touch it from threadpool workers concurrently.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                self._entries.pop(key, None)
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store value under key for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def adjust(self, key: str, delta: int) -> None:
+        """Add delta to a live numeric entry, keeping its original expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries[key] = (entry[0], entry[1] + delta)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the entry for key, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+ACCOUNT_INFO_TTL = 10  # seconds; front-end polling reuses the last response
+
+_account_cache = TTLCache()
+
+def cached_account_info(addr: str, ttl: float = ACCOUNT_INFO_TTL) -> dict:
+    """Return Algod account_info for addr, reusing a response younger than ttl."""
+    info = _account_cache.get(addr)
+    if info is None:
+        info = client.account_info(addr)
+        _account_cache.set(addr, info, ttl)
+    return info
+
+PARAMS_TTL = 3  # seconds; params only change when a new round lands (~3-4 s)
+
+_params_cache = TTLCache()
+
+def cached_params():
+    """Return Algod suggested_params, reusing a response younger than PARAMS_TTL."""
+    sp = _params_cache.get("sp")
+    if sp is None:
+        sp = client.suggested_params()
+        _params_cache.set("sp", sp, PARAMS_TTL)
+    return sp
+
+_balance_cache = TTLCache()
+
+def treasury_balance(fresh: bool = False) -> int:
+    """
+    Return the treasury ASA balance. Within BALANCE_TTL of the last Algod read,
+    the value is kept current from our own confirmed distributions instead of
+    being re-fetched; incoming tax is only picked up by the next read.
+    fresh=True forces that read now.
+    """
+    _, treasury_addr = treasury_keys()
+    if fresh:
+        _balance_cache.invalidate(treasury_addr)
+    bal = _balance_cache.get(treasury_addr)
+    if bal is None:
+        # Read live rather than through _account_cache, so the tracked value is
+        # never older than BALANCE_TTL (capped at ACCOUNT_INFO_TTL)
+        info = client.account_info(treasury_addr)
+        _account_cache.set(treasury_addr, info, ACCOUNT_INFO_TTL)
+        bal = asa_amount(info, ASSET_ID)
+        _balance_cache.set(treasury_addr, bal, min(BALANCE_TTL, ACCOUNT_INFO_TTL))
+    return bal
+
+# ─── Request / response models ─────────────────────────────────────────────────
+# Endpoints declare these as return types: FastAPI then serializes the models
+# straight to JSON bytes through pydantic, skipping jsonable_encoder.
 class Distribution(BaseModel):
     burn:    conint(ge=0)
     lp:      conint(ge=0)
     rewards: conint(ge=0)
 
+class TreasuryBalance(BaseModel):
+    treasury_balance: int
+
+class DistributionResult(BaseModel):
+    status:      str
+    txid:        str
+    distributed: Distribution
+
 # ─── Endpoint: Get treasury balance ────────────────────────────────────────────
 @app.get("/treasury-balance")
-def get_treasury_balance():
+def get_treasury_balance() -> TreasuryBalance:
     """Return the current Dumbly ASA balance in the treasury account."""
-    acct_info = client.account_info(treasury_addr)
-    assets    = acct_info.get("assets", [])
-    bal       = next((a["amount"] for a in assets if a["asset-id"] == ASSET_ID), 0)
-    return {"treasury_balance": bal}
+    _, treasury_addr = treasury_keys()
+    bal = asa_amount(cached_account_info(treasury_addr), ASSET_ID)
+    return TreasuryBalance(treasury_balance=bal)
 
-# ─── Endpoint: Manual distribution ─────────────────────────────────────────────
-@app.post("/distribute-manual")
-def distribute_manual(dist: Distribution):
+# ─── Helpers shared by the distribution endpoints ──────────────────────────────
+async def _fetch_state(fresh: bool = False):
     """
-    Distribute specified amounts of Dumbly from treasury to Burn, LP, Rewards.
-    Validates that total requested ≤ current balance.
+    Fetch the treasury ASA balance (live if fresh) and suggested params
+    concurrently. Both are blocking Algod GETs, so they run side by side on
+    the threadpool.
     """
-    # Fetch current balance
-    acct_info = client.account_info(treasury_addr)
-    assets    = acct_info.get("assets", [])
-    total     = next((a["amount"] for a in assets if a["asset-id"] == ASSET_ID), 0)
+    total, sp = await asyncio.gather(
+        run_in_threadpool(treasury_balance, fresh),
+        run_in_threadpool(cached_params),
+    )
+    return total, sp
 
-    requested = dist.burn + dist.lp + dist.rewards
-    if requested > total:
-        raise HTTPException(400, detail=f"Requested ({requested}) > balance ({total})")
-
-    # Build and group transactions
-    sp = client.suggested_params()
-    txs = [
-        AssetTransferTxn(treasury_addr, sp, BURN_ADDR,    dist.burn,    ASSET_ID),
-        AssetTransferTxn(treasury_addr, sp, LP_ADDR,      dist.lp,      ASSET_ID),
-        AssetTransferTxn(treasury_addr, sp, REWARDS_ADDR, dist.rewards, ASSET_ID),
-    ]
+def _signed_group(sp, burn: int, lp: int, rewards: int) -> list:
+    """
+    Build, group and sign the Burn/LP/Rewards transfers for these amounts.
+    A random note makes every group unique: requests sharing cached params
+    with the same amounts would otherwise produce identical txids, and Algod
+    rejects all but the first as duplicates.
+    """
+    treasury_sk, treasury_addr = treasury_keys()
+    txs = build_transfers(treasury_addr, sp, ASSET_ID, [
+        (BURN_ADDR,    burn),
+        (LP_ADDR,      lp),
+        (REWARDS_ADDR, rewards),
+    ], note=os.urandom(8))
     gid = calculate_group_id(txs)
     for tx in txs:
         tx.group = gid
+    return sign_all(txs, treasury_sk)
 
-    # Sign & send
+def _send_group(sp, burn: int, lp: int, rewards: int) -> str:
+    """Send the signed Burn/LP/Rewards group and wait for it; return the txid."""
+    _, treasury_addr = treasury_keys()
     try:
-        signed = [tx.sign(treasury_sk) for tx in txs]
+        signed = _signed_group(sp, burn, lp, rewards)
         txid   = client.send_transactions(signed)
         wait_for_confirmation(client, txid, 4)
     except AlgodHTTPError as e:
+        _balance_cache.invalidate(treasury_addr)
         raise HTTPException(500, detail=f"Algod error: {e}")
+    except Exception:
+        _balance_cache.invalidate(treasury_addr)
+        raise
+    finally:
+        # Balance has (or may have) moved: force the next read to hit Algod
+        _account_cache.invalidate(treasury_addr)
+        # Build the next group on fresh params
+        _params_cache.invalidate("sp")
 
-    return {
-        "status": "success",
-        "txid": txid,
-        "distributed": {"burn": dist.burn, "lp": dist.lp, "rewards": dist.rewards}
-    }
+    # Confirmed: we know exactly what left the treasury
+    _balance_cache.adjust(treasury_addr, -(burn + lp + rewards))
+    return txid
+
+# ─── Endpoint: Manual distribution ─────────────────────────────────────────────
+@app.post("/distribute-manual")
+async def distribute_manual(dist: Distribution, validate: bool = True) -> DistributionResult:
+    """
+    Distribute specified amounts of Dumbly from treasury to Burn, LP, Rewards.
+    Validates that total requested ≤ current balance.
+
+    Trusted callers may pass ?validate=false to skip the balance read: Algod
+    rejects an overspending group atomically anyway, but the caller then gets
+    a 500 carrying Algod's error instead of a 400. An all-zero request never
+    needs the check.
+    """
+    requested = dist.burn + dist.lp + dist.rewards
+    if validate and requested:
+        total, sp = await _fetch_state()
+        if requested > total:
+            # The cached balance may predate incoming tax: re-check live
+            total = await run_in_threadpool(treasury_balance, True)
+        if requested > total:
+            raise HTTPException(400, detail=f"Requested ({requested}) > balance ({total})")
+    else:
+        sp = await run_in_threadpool(cached_params)
+
+    # Sending blocks until confirmation: keep it off the event loop
+    txid = await run_in_threadpool(_send_group, sp, dist.burn, dist.lp, dist.rewards)
+
+    return DistributionResult(status="success", txid=txid, distributed=dist)
 
 # ─── Endpoint: Automatic distribution ──────────────────────────────────────────
 @app.post("/distribute-all")
-def distribute_all():
+async def distribute_all() -> DistributionResult:
     """
     Split the entire treasury balance evenly into three parts:
     Burn, LP, and Rewards (floor division for two parts, remainder to LP).
+    The balance is read live, so tax received moments ago is included.
     """
-    acct_info = client.account_info(treasury_addr)
-    assets    = acct_info.get("assets", [])
-    total     = next((a["amount"] for a in assets if a["asset-id"] == ASSET_ID), 0)
+    total, sp = await _fetch_state(fresh=True)
 
     burn_amt    = total // 3
     rewards_amt = total // 3
     lp_amt      = total - burn_amt - rewards_amt
 
-    sp = client.suggested_params()
-    txs = [
-        AssetTransferTxn(treasury_addr, sp, BURN_ADDR,    burn_amt,    ASSET_ID),
-        AssetTransferTxn(treasury_addr, sp, LP_ADDR,      lp_amt,      ASSET_ID),
-        AssetTransferTxn(treasury_addr, sp, REWARDS_ADDR, rewards_amt, ASSET_ID),
-    ]
-    gid = calculate_group_id(txs)
-    for tx in txs:
-        tx.group = gid
-
-    try:
-        signed = [tx.sign(treasury_sk) for tx in txs]
-        txid   = client.send_transactions(signed)
-        wait_for_confirmation(client, txid, 4)
-    except AlgodHTTPError as e:
-        raise HTTPException(500, detail=f"Algod error: {e}")
+    txid = await run_in_threadpool(_send_group, sp, burn_amt, lp_amt, rewards_amt)
 
-    return {
-        "status": "success",
-        "txid": txid,
-        "distributed": {"burn": burn_amt, "lp": lp_amt, "rewards": rewards_amt}
-    }
+    return DistributionResult(
+        status="success",
+        txid=txid,
+        distributed=Distribution(burn=burn_amt, lp=lp_amt, rewards=rewards_amt),
+    )
@@ -5,7 +5,7 @@ test_distribute_all.py
 End-to-end test for the `/distribute-all` endpoint of the FastAPI backend.
 
 This test will:
-  1. Top up the Treasury account by running the `test_tax.py` script.
+  1. Top up the Treasury account via `test_tax.fund_treasury()`.
   2. Verify the Treasury’s initial ASA balance is at least 3 units.
   3. Call the `/distribute-all` API and expect a successful response.
   4. Check that the sum of burn, lp, and rewards equals the initial balance.
@@ -13,17 +13,18 @@ This test will:
 """
 
 import os
-import subprocess
 import pytest
-from dotenv import load_dotenv
 from fastapi.testclient import TestClient
 from algosdk import mnemonic, account
 from algosdk.v2client import algod
 
+from common import asa_amount, load_env
+
 # Load environment variables from .env
-load_dotenv()
+load_env()
 
 from service import app, ASSET_ID, TREASURY_MNEMONIC
+from test_tax import fund_treasury
 
 client_api = TestClient(app)
 
@@ -47,14 +48,10 @@ def treasury_addr(treasury_sk):
 
 def test_distribute_all(algod_client, treasury_sk, treasury_addr):
     # 1) Credit the Treasury by simulating a sale + tax
-    subprocess.run(["python", "tests/test_tax.py"], check=True)
+    fund_treasury()
 
     # 2) Fetch the initial balance and ensure it's >= 3 units
-    acct_info = algod_client.account_info(treasury_addr)
-    initial_total = next(
-        (a["amount"] for a in acct_info.get("assets", []) if a["asset-id"] == ASSET_ID),
-        0
-    )
+    initial_total = asa_amount(algod_client.account_info(treasury_addr), ASSET_ID)
     assert initial_total >= 3, f"Initial balance too low ({initial_total}) for testing distribute-all"
 
     # 3) Call the distribute-all endpoint
@@ -74,9 +71,5 @@ def test_distribute_all(algod_client, treasury_sk, treasury_addr):
     )
 
     # 5) Verify the Treasury is now empty
-    acct_after = algod_client.account_info(treasury_addr)
-    new_total = next(
-        (a["amount"] for a in acct_after.get("assets", []) if a["asset-id"] == ASSET_ID),
-        0
-    )
+    new_total = asa_amount(algod_client.account_info(treasury_addr), ASSET_ID)
     assert new_total == 0, f"Treasury not emptied, remaining balance: {new_total}"
@@ -0,0 +1,102 @@
+#!/usr/bin/env pytest
+"""
+test_distribute_txids.py
+
+Offline tests for the service's params cache: identical distributions, sent
+back to back or concurrently (and so possibly from the same cached params),
+must get different txids, since Algod rejects a resubmitted txid as a
+duplicate.
+
+Algod is replaced by a stub whose round advances each time a group confirms,
+like a real node; no network access or funded accounts are needed.
+"""
+
+import asyncio
+import os
+import threading
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from algosdk import account, mnemonic
+from algosdk.transaction import SuggestedParams
+
+from common import load_env
+
+# Real .env values win; fill in throwaway ones only where they are missing
+load_env()
+_sk, _addr = account.generate_account()
+for _name, _default in {
+    "ALGOD_ADDRESS":     "http://localhost:4001",
+    "TREASURY_MNEMONIC": mnemonic.from_private_key(_sk),
+    "ASSET_ID":          "1",
+    "BURN_ADDR":         account.generate_account()[1],
+    "LP_ADDR":           account.generate_account()[1],
+    "REWARDS_ADDR":      account.generate_account()[1],
+}.items():
+    os.environ.setdefault(_name, _default)
+
+import service
+
+class StubAlgod:
+    """Just enough of AlgodClient for _send_group; each confirmation advances a round."""
+
+    def __init__(self):
+        self.round = 1_000
+        self.txids = []
+        self._lock = threading.Lock()
+
+    def suggested_params(self):
+        return SuggestedParams(
+            0, self.round, self.round + 1_000,
+            "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", "testnet-v1.0",
+            min_fee=1_000,
+        )
+
+    def send_transactions(self, signed):
+        txid = signed[0].get_txid()
+        with self._lock:
+            assert txid not in self.txids, "transaction already in ledger"
+            self.txids.append(txid)
+        return txid
+
+    def status(self):
+        return {"last-round": self.round}
+
+    def pending_transaction_info(self, txid, **kwargs):
+        with self._lock:
+            self.round += 1
+            return {"confirmed-round": self.round}
+
+@pytest.fixture
+def stub_algod(monkeypatch):
+    stub = StubAlgod()
+    monkeypatch.setattr(service, "client", stub)
+    service._params_cache.invalidate("sp")
+    return stub
+
+def test_identical_distributions_get_distinct_txids(stub_algod):
+    api  = TestClient(service.app)
+    dist = {"burn": 10, "lp": 20, "rewards": 30}
+
+    first  = api.post("/distribute-manual?validate=false", json=dist)
+    second = api.post("/distribute-manual?validate=false", json=dist)
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert first.json()["txid"] != second.json()["txid"]
+
+def test_concurrent_identical_distributions_get_distinct_txids(stub_algod):
+    dist = {"burn": 10, "lp": 20, "rewards": 30}
+
+    async def send_both():
+        transport = httpx.ASGITransport(app=service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            return await asyncio.gather(*(
+                api.post("/distribute-manual?validate=false", json=dist) for _ in range(2)
+            ))
+
+    first, second = asyncio.run(send_both())
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert first.json()["txid"] != second.json()["txid"]
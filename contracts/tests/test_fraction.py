@@ -5,115 +5,147 @@ test_fraction.py
 Quick script to verify that partial (fractional) transfers of the Dumbly ASA work as expected.
 
 Steps performed:
-  1. Opt-in the receiver account (if not already opted in).
-  2. Send 0.5 Dumbly (500_000 base units) from the admin account to the receiver.
+  1. Opt-in the buyer account (if not already opted in).
+  2. Send 0.5 Dumbly (500_000 base units) from the admin account to RECEIVER_ADDR;
+     when the buyer still needs to opt in, its opt-in goes in the same atomic
+     group as this transfer.
   3. Confirm the receiver’s new balance.
 
 Environment variables (.env):
   ALGOD_ADDRESS    Algod API endpoint (e.g. https://testnet-api.algonode.cloud)
   ALGOD_TOKEN      Algod API token (may be empty)
   ADMIN_MNEMONIC   25-word mnemonic for the admin account (issuer)
-  BUYER_MNEMONIC   25-word mnemonic for the receiver account
+  BUYER_MNEMONIC   25-word mnemonic for the buyer account
   ASSET_ID         Numeric ASA ID for Dumbly (with 6 decimals)
   RECEIVER_ADDR    Public address of the receiver account
 
 Usage:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
   python test_fraction.py
 """
 
+import logging
 import os
 import sys
-from dotenv import load_dotenv
-from algosdk import mnemonic, account
-from algosdk.v2client import algod
-from algosdk.transaction import AssetTransferTxn, wait_for_confirmation
-from algosdk.error import AlgodHTTPError
-
-load_dotenv()
-
-# Load configuration from environment
-ALGOD_ADDRESS    = os.getenv("ALGOD_ADDRESS")
-ALGOD_TOKEN      = os.getenv("ALGOD_TOKEN", "")
-ADMIN_MNEMONIC   = os.getenv("ADMIN_MNEMONIC")
-BUYER_MNEMONIC   = os.getenv("BUYER_MNEMONIC")
-ASSET_ID         = int(os.getenv("ASSET_ID", "0"))
-RECEIVER_ADDR    = os.getenv("RECEIVER_ADDR")
-
-# Basic validation
-if not all([ALGOD_ADDRESS, ADMIN_MNEMONIC, BUYER_MNEMONIC, ASSET_ID, RECEIVER_ADDR]):
-    print("ERROR: One or more required environment variables are missing.")
-    sys.exit(1)
-
-def init_client():
-    """Initialize and return an Algod client."""
+from functools import lru_cache
+from algosdk import constants
+from algosdk.transaction import AssetTransferTxn, calculate_group_id
+from algosdk.error import (
+    AlgodHTTPError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
+)
+
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import (
+    PooledAlgodClient,
+    asa_holding,
+    fast_wait,
+    get_client,
+    keys_from_mnemonic,
+    load_env,
+)
+
+load_env()
+
+log = logging.getLogger(__name__)
+
+# Configuration is validated on first use rather than at import, so pytest
+# can still collect this module when these variables are not set
+REQUIRED = (
+    "ALGOD_ADDRESS",
+    "ADMIN_MNEMONIC",
+    "BUYER_MNEMONIC",
+    "ASSET_ID",
+    "RECEIVER_ADDR",
+)
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """Return the REQUIRED env vars (plus ALGOD_TOKEN), exiting if any is missing."""
+    missing = [k for k in REQUIRED if not os.getenv(k)]
+    if missing:
+        sys.exit(f"ERROR: Missing environment variables: {', '.join(missing)}")
+    cfg = {k: os.getenv(k) for k in REQUIRED}
+    cfg["ALGOD_TOKEN"] = os.getenv("ALGOD_TOKEN", "")
+    return cfg
+
+def init_client() -> PooledAlgodClient:
+    """Return the process-wide pooled Algod client (see common.get_client)."""
     try:
-        return algod.AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+        cfg = load_config()
+        return get_client(cfg["ALGOD_TOKEN"], cfg["ALGOD_ADDRESS"])
     except Exception as e:
-        print(f"ERROR: Unable to connect to Algod: {e}")
+        log.error("Unable to connect to Algod: %s", e)
         sys.exit(1)
 
 def get_keypair(mnemonic_env: str):
-    """Convert a mnemonic env var to (private_key, public_address)."""
-    mnem = os.getenv(mnemonic_env)
+    """Convert a mnemonic env var to (private_key, public_address), derived once per mnemonic."""
     try:
-        pk   = mnemonic.to_private_key(mnem)
-        addr = account.address_from_private_key(pk)
-        return pk, addr
+        return keys_from_mnemonic(load_config()[mnemonic_env])
     except Exception as e:
-        print(f"ERROR: Failed to derive keys from {mnemonic_env}: {e}")
+        log.error("Failed to derive keys from %s: %s", mnemonic_env, e)
         sys.exit(1)
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     client   = init_client()
     sp       = client.suggested_params()
+    # One set of params for the whole run: its validity window (~1000 rounds)
+    # outlasts every transaction below. A flat minimum fee skips the SDK's
+    # per-transaction fee estimate (a throwaway signature each). Never reuse
+    # another run's params: they would rebuild byte-identical transactions,
+    # which Algod rejects as duplicates.
+    sp.flat_fee = True
+    sp.fee      = constants.min_txn_fee
     admin_sk, admin_addr = get_keypair("ADMIN_MNEMONIC")
     buyer_sk, buyer_addr = get_keypair("BUYER_MNEMONIC")
+    cfg           = load_config()
+    asset_id      = int(cfg["ASSET_ID"])
+    receiver_addr = cfg["RECEIVER_ADDR"]
 
-    # 1) Opt-in buyer account to the ASA
-    try:
-        optin_txn = AssetTransferTxn(
-            sender=buyer_addr,
-            sp=sp,
-            receiver=buyer_addr,
-            amt=0,
-            index=ASSET_ID
-        )
-        signed_optin = optin_txn.sign(buyer_sk)
-        txid = client.send_transaction(signed_optin)
-        wait_for_confirmation(client, txid, 4)
-        print(f"✅ Opt-in successful for {buyer_addr}")
-    except AlgodHTTPError as e:
-        print(f"⚠️ Opt-in might already be done or failed: {e}")
-
-    # 2) Send 0.5 Dumbly (500_000 units)
+    # 1+2) Send 0.5 Dumbly (500_000 units). Unless a previous run already did,
+    #      the buyer's opt-in rides in the same atomic group, so both land in
+    #      one round.
     fraction = 500_000
     try:
         send_txn = AssetTransferTxn(
             sender=admin_addr,
             sp=sp,
-            receiver=RECEIVER_ADDR,
+            receiver=receiver_addr,
             amt=fraction,
-            index=ASSET_ID
+            index=asset_id
         )
-        signed_send = send_txn.sign(admin_sk)
-        txid = client.send_transaction(signed_send)
-        wait_for_confirmation(client, txid, 4)
-        print(f"→ Sent {fraction} units (0.5 Dumbly) to {RECEIVER_ADDR} (txID={txid})")
-    except AlgodHTTPError as e:
-        print(f"ERROR: Fractional transfer failed: {e}")
+        if asa_holding(client, buyer_addr, asset_id) is not None:
+            log.info("%s already opted-in", buyer_addr)
+            txid = client.send_transaction(send_txn.sign(admin_sk))
+            fast_wait(client, txid)
+        else:
+            optin_txn = AssetTransferTxn(
+                sender=buyer_addr,
+                sp=sp,
+                receiver=buyer_addr,
+                amt=0,
+                index=asset_id
+            )
+            gid = calculate_group_id([optin_txn, send_txn])
+            optin_txn.group = send_txn.group = gid
+            client.send_transactions([optin_txn.sign(buyer_sk), send_txn.sign(admin_sk)])
+            txid = send_txn.get_txid()
+            fast_wait(client, txid)
+            log.info("Opt-in successful for %s", buyer_addr)
+        log.info("Sent %d units (0.5 Dumbly) to %s (txID=%s)", fraction, receiver_addr, txid)
+    except (AlgodHTTPError, ConfirmationTimeoutError, TransactionRejectedError) as e:
+        log.error("Fractional transfer failed: %s", e)
         sys.exit(1)
 
     # 3) Verify receiver balance
     try:
-        acct_info = client.account_info(RECEIVER_ADDR)
-        balance = next(
-            (a["amount"] for a in acct_info.get("assets", []) if a["asset-id"] == ASSET_ID),
-            0
-        )
-        print(f"✅ Receiver balance = {balance} units (fractions OK)")
+        balance = asa_holding(client, receiver_addr, asset_id) or 0
+        log.info("Receiver balance = %d units (fractions OK)", balance)
     except AlgodHTTPError as e:
-        print(f"ERROR: Unable to fetch receiver balance: {e}")
+        log.error("Unable to fetch receiver balance: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -24,118 +24,189 @@ Environment variables (.env):
   ASSET_ID          ASA ID for the token
 
 Usage:
-  pip install python-dotenv py-algorand-sdk
+  pip install python-dotenv py-algorand-sdk requests
   python test_tax.py
+
+Other tests import fund_treasury() to top up the Treasury in-process.
 """
 
+import logging
 import os
 import sys
-from dotenv import load_dotenv
-from algosdk import mnemonic, account
-from algosdk.v2client import algod
-from algosdk.transaction import (
-    AssetTransferTxn,
-    ApplicationNoOpTxn,
-    calculate_group_id,
-    wait_for_confirmation,
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from algosdk import constants
+from algosdk.transaction import ApplicationNoOpTxn
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionWithSigner
+from algosdk.error import (
+    AlgodHTTPError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
 )
-from algosdk.error import AlgodHTTPError
 
-load_dotenv()
+# Shared helpers live one level up, in contracts/common.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import (
+    PooledAccountSigner,
+    PooledAlgodClient,
+    asa_holding,
+    build_optins,
+    build_transfers,
+    fast_wait,
+    get_client,
+    keys_from_mnemonic,
+    load_env,
+)
 
-def get_env_var(name: str) -> str:
-    """Retrieve an environment variable or exit if missing."""
-    val = os.getenv(name)
-    if not val:
-        print(f"ERROR: Missing environment variable: {name}")
-        sys.exit(1)
-    return val
+load_env()
 
-def init_client() -> algod.AlgodClient:
-    """Initialize and return an Algod client."""
-    address = get_env_var("ALGOD_ADDRESS")
-    token   = os.getenv("ALGOD_TOKEN", "")
+log = logging.getLogger(__name__)
+
+# Configuration is validated on first use rather than at import, so pytest
+# can still collect this module (and test_distribute_all can import from it)
+# when these variables are not set
+REQUIRED = (
+    "ALGOD_ADDRESS",
+    "ADMIN_MNEMONIC",
+    "BUYER_MNEMONIC",
+    "TREASURY_MNEMONIC",
+    "APP_ID",
+    "ASSET_ID",
+)
+
+@lru_cache(maxsize=1)
+def load_config() -> dict:
+    """Return the REQUIRED env vars (plus ALGOD_TOKEN), exiting if any is missing."""
+    missing = [k for k in REQUIRED if not os.getenv(k)]
+    if missing:
+        sys.exit(f"ERROR: Missing environment variables: {', '.join(missing)}")
+    cfg = {k: os.getenv(k) for k in REQUIRED}
+    cfg["ALGOD_TOKEN"] = os.getenv("ALGOD_TOKEN", "")
+    return cfg
+
+# Simulated sale: AMOUNT base units, TAX_BPS of which go to the Treasury
+AMOUNT     = 1_000
+TAX_BPS    = 900  # 9.00%
+NET_AMOUNT = AMOUNT * (10_000 - TAX_BPS) // 10_000
+TAX_AMOUNT = AMOUNT - NET_AMOUNT
+
+def init_client() -> PooledAlgodClient:
+    """Return the process-wide pooled Algod client (see common.get_client)."""
     try:
-        return algod.AlgodClient(token, address)
+        cfg = load_config()
+        return get_client(cfg["ALGOD_TOKEN"], cfg["ALGOD_ADDRESS"])
     except Exception as e:
-        print(f"ERROR: Failed to connect to Algod: {e}")
+        log.error("Failed to connect to Algod: %s", e)
         sys.exit(1)
 
 def load_keypair(env_key: str):
-    """Convert a mnemonic env var to (private_key, address)."""
-    m = get_env_var(env_key)
-    sk = mnemonic.to_private_key(m)
-    addr = account.address_from_private_key(sk)
-    return sk, addr
+    """Convert a mnemonic env var to (private_key, address), derived once per mnemonic."""
+    return keys_from_mnemonic(load_config()[env_key])
+
+def _optin_one(client, txn, sk, asset_id):
+    """
+    Send one account's prebuilt opt-in txn, unless it already holds the ASA,
+    and wait for confirmation.
+    Returns the account's balance of the ASA (0 after a fresh opt-in), or
+    None if it could not be determined.
+    """
+    addr = txn.sender
+    try:
+        balance = asa_holding(client, addr, asset_id)
+        if balance is not None:
+            log.info("%s already opted-in (ASA %d)", addr, asset_id)
+            return balance
+        stx = txn.sign(sk)
+        txid = client.send_transaction(stx)
+        fast_wait(client, txid)
+        log.info("%s opt-in OK (ASA %d)", addr, asset_id)
+        return 0
+    except (AlgodHTTPError, ConfirmationTimeoutError, TransactionRejectedError) as e:
+        log.warning("Opt-in failed or already done for %s: %s", addr, e)
+        return None
 
 def opt_in_accounts(client, sp, accounts, asset_id):
-    """Opt-in each account in the list to the given ASA."""
-    for sk, addr in accounts:
-        try:
-            txn = AssetTransferTxn(sender=addr, sp=sp, receiver=addr, amt=0, index=asset_id)
-            stx = txn.sign(sk)
-            txid = client.send_transaction(stx)
-            wait_for_confirmation(client, txid, 4)
-            print(f"✅ {addr} opt-in OK (ASA {asset_id})")
-        except AlgodHTTPError as e:
-            print(f"⚠️ Opt-in failed or already done for {addr}: {e}")
-
-def main():
+    """
+    Opt-in each account in the list to the given ASA. The opt-ins have
+    independent senders, so they are sent and confirmed concurrently.
+
+    Returns {address: balance of the ASA} from the pre-opt-in check (None
+    where it failed), so callers need not fetch the account again.
+    """
+    txns = build_optins(sp, asset_id, [addr for _, addr in accounts])
+    with ThreadPoolExecutor(max_workers=len(accounts)) as ex:
+        futures = {
+            ex.submit(_optin_one, client, txn, sk, asset_id): txn.sender
+            for (sk, _), txn in zip(accounts, txns)
+        }
+        return {futures[f]: f.result() for f in as_completed(futures)}
+
+def fund_treasury():
+    """
+    Run the taxed sale once, crediting the Treasury with the tax amount, and
+    assert the Treasury balance grew by exactly that amount.
+    """
     client = init_client()
     sp = client.suggested_params()
+    # One set of params for the whole run: its validity window (~1000 rounds)
+    # outlasts every transaction below. A flat minimum fee skips the SDK's
+    # per-transaction fee estimate (a throwaway signature each). Never reuse
+    # another run's params: they would rebuild byte-identical transactions,
+    # which Algod rejects as duplicates.
+    sp.flat_fee = True
+    sp.fee      = constants.min_txn_fee
 
     # Load keypairs
     admin_sk, admin_addr       = load_keypair("ADMIN_MNEMONIC")
     buyer_sk, buyer_addr       = load_keypair("BUYER_MNEMONIC")
     treas_sk, treas_addr       = load_keypair("TREASURY_MNEMONIC")
-    app_id  = int(get_env_var("APP_ID"))
-    asset_id= int(get_env_var("ASSET_ID"))
+    cfg      = load_config()
+    app_id   = int(cfg["APP_ID"])
+    asset_id = int(cfg["ASSET_ID"])
 
     # 1) Opt-in Buyer & Treasury
-    opt_in_accounts(client, sp, [(buyer_sk, buyer_addr), (treas_sk, treas_addr)], asset_id)
+    balances = opt_in_accounts(client, sp, [(buyer_sk, buyer_addr), (treas_sk, treas_addr)], asset_id)
 
-    # 2) Record initial Treasury balance
-    acct = client.account_info(treas_addr)
-    initial_balance = next(
-        (a["amount"] for a in acct.get("assets", []) if a["asset-id"] == asset_id),
-        0
-    )
-    print(f"ℹ️ Initial Treasury balance = {initial_balance} Dumbly")
+    # 2) Record initial Treasury balance, already read by the opt-in check
+    initial_balance = balances[treas_addr]
+    if initial_balance is None:
+        initial_balance = asa_holding(client, treas_addr, asset_id) or 0
+    log.info("Initial Treasury balance = %d Dumbly", initial_balance)
 
     # 3) Simulate sale + tax
-    amount     = 1_000
-    net_amount = amount * 91 // 100
-    tax_amount = amount - net_amount
-
-    txn1 = AssetTransferTxn(sender=admin_addr, sp=sp, receiver=buyer_addr, amt=net_amount, index=asset_id)
-    txn2 = AssetTransferTxn(sender=admin_addr, sp=sp, receiver=treas_addr, amt=tax_amount, index=asset_id)
+    txn1, txn2 = build_transfers(
+        admin_addr, sp, asset_id, [(buyer_addr, NET_AMOUNT), (treas_addr, TAX_AMOUNT)]
+    )
     txn3 = ApplicationNoOpTxn(sender=admin_addr, sp=sp, index=app_id, app_args=[b"tax"])
 
-    group = [txn1, txn2, txn3]
-    gid = calculate_group_id(group)
-    for tx in group:
-        tx.group = gid
-
-    signed_group = [txn1.sign(admin_sk), txn2.sign(admin_sk), txn3.sign(admin_sk)]
+    # The composer assigns the group id and signs; submit() rather than
+    # execute() so confirmation goes through fast_wait's 0.5 s polling
+    signer   = PooledAccountSigner(admin_sk)
+    composer = AtomicTransactionComposer()
+    for txn in (txn1, txn2, txn3):
+        composer.add_transaction(TransactionWithSigner(txn, signer))
 
     try:
-        txid = client.send_transactions(signed_group)
-        print(f"⏳ Group tx sent, txID: {txid}")
-        wait_for_confirmation(client, txid, 4)
-    except AlgodHTTPError as e:
-        print(f"ERROR: Failed during test_tax group send: {e}")
+        txid = composer.submit(client)[0]
+        log.info("Group tx sent, txID: %s", txid)
+        fast_wait(client, txid)
+    except (AlgodHTTPError, ConfirmationTimeoutError, TransactionRejectedError) as e:
+        log.error("Failed during test_tax group send: %s", e)
         sys.exit(1)
 
     # 4) Verify the tax landed correctly
-    acct_after = client.account_info(treas_addr)
-    new_balance = next(
-        (a["amount"] for a in acct_after.get("assets", []) if a["asset-id"] == asset_id),
-        0
-    )
+    new_balance = asa_holding(client, treas_addr, asset_id) or 0
     delta = new_balance - initial_balance
-    print(f"✅ Final Treasury balance = {new_balance} Dumbly  (delta = {delta}, expected = {tax_amount})")
+    log.info(
+        "Final Treasury balance = %d Dumbly  (delta = %d, expected = %d)",
+        new_balance, delta, TAX_AMOUNT,
+    )
 
-    assert delta == tax_amount, "ERROR: Tax amount incorrect"
+    assert delta == TAX_AMOUNT, f"ERROR: Tax amount incorrect (delta = {delta}, expected = {TAX_AMOUNT})"
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    fund_treasury()
 
 if __name__ == "__main__":
     main()